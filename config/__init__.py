@@ -0,0 +1,7 @@
+try:
+    from .celery import app as celery_app
+except ImportError:
+    # Celery is optional; without it jobs run in background threads
+    celery_app = None
+
+__all__ = ('celery_app',)
@@ -0,0 +1,15 @@
+"""
+Celery app for running scraper jobs in worker processes.
+
+Only used when CELERY_BROKER_URL is set; otherwise jobs run in a
+background thread of the web process.
+"""
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+app = Celery('config')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
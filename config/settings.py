@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
 from decouple import config, Csv
 
 
@@ -52,6 +53,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'scraper.middleware.JsonApiErrorMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -81,6 +83,9 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Reuse connections across requests instead of reconnecting each time
+        'CONN_MAX_AGE': config('CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
@@ -131,4 +136,38 @@ MEDIA_ROOT = BASE_DIR / 'media'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 STATIC_ROOT = BASE_DIR / 'staticfiles'
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
\ No newline at end of file
+STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+
+# Background jobs
+# Set CELERY_BROKER_URL (e.g. redis://localhost:6379/0) to run scraper jobs in
+# Celery workers; when unset they run in a thread of the web process.
+CELERY_BROKER_URL = config('CELERY_BROKER_URL', default='')
+CELERY_TASK_ACKS_LATE = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+SCRAPER_JOB_SOFT_TIME_LIMIT = config('SCRAPER_JOB_SOFT_TIME_LIMIT', default=6 * 60 * 60, cast=int)
+# Unacked tasks are redelivered after visibility_timeout on Redis (default 1 h);
+# keep it above the longest job so a running job isn't handed to a second worker
+CELERY_BROKER_TRANSPORT_OPTIONS = {'visibility_timeout': SCRAPER_JOB_SOFT_TIME_LIMIT + 10 * 60}
+# Dedicated queue so scraper workers can be scaled separately (celery worker -Q scraper)
+SCRAPER_QUEUE = 'scraper'
+
+# Cache
+# Cached interaction totals and the workspace list are invalidated on writes,
+# which only reaches other web and Celery worker processes through a shared
+# backend. Defaults to the next database index on the Redis broker, never the
+# broker's own, so a cache.clear() (FLUSHDB) can't drop queued or unacked tasks;
+# without Redis each process keeps its own short-lived copy.
+def _next_redis_db(url):
+    parts = urlsplit(url)
+    db = int(parts.path.strip('/') or 0)
+    return urlunsplit(parts._replace(path=f'/{db + 1}'))
+
+
+CACHE_URL = config('CACHE_URL', default=_next_redis_db(CELERY_BROKER_URL) if CELERY_BROKER_URL.startswith('redis') else '')
+if CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
+    }
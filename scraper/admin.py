@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Interaction, ScraperJob
+from .models import DOICache, Interaction, ScraperJob
 
 
 @admin.register(Interaction)
@@ -18,3 +18,11 @@ class ScraperJobAdmin(admin.ModelAdmin):
     readonly_fields = ('started_at', 'completed_at')
     ordering = ('-started_at',)
 
+
+
+@admin.register(DOICache)
+class DOICacheAdmin(admin.ModelAdmin):
+    list_display = ('doi', 'status', 'pdf_path', 'updated_at')
+    list_filter = ('status',)
+    search_fields = ('doi',)
+    ordering = ('-updated_at',)
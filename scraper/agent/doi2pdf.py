@@ -1,10 +1,13 @@
 import os
 import re
-import json
-import urllib.request
+import threading
 import urllib.parse
 from typing import Optional
 
+import httpx
+
+from .http_client import HTTP
+
 try:
     from django.conf import settings
     DJANGO_AVAILABLE = True
@@ -12,8 +15,25 @@ except ImportError:
     DJANGO_AVAILABLE = False
 
 
+CHUNK_SIZE = 64 * 1024
+MAX_PDF_BYTES = 500 * 1024 * 1024
+MAX_REQUESTS_PER_HOST = 4
+
+_host_semaphores: dict[str, threading.Semaphore] = {}
+_host_semaphores_lock = threading.Lock()
+
+
+def _host_slot(url: str) -> threading.Semaphore:
+    """Semaphore limiting concurrent requests to the host of url"""
+    host = urllib.parse.urlsplit(url).hostname or ""
+    with _host_semaphores_lock:
+        if host not in _host_semaphores:
+            _host_semaphores[host] = threading.Semaphore(MAX_REQUESTS_PER_HOST)
+        return _host_semaphores[host]
+
+
 class PDFFromDOI:
-    def __init__(self, output_dir: str = None, brightdata_api_key: Optional[str] = None, unpaywall_email: str = "test@google.com") -> None:
+    def __init__(self, output_dir: str = None, brightdata_api_key: Optional[str] = None, unpaywall_email: str = "test@google.com", client: Optional[httpx.Client] = None) -> None:
         if output_dir is None and DJANGO_AVAILABLE:
             output_dir = os.path.join(settings.BASE_DIR, 'media', 'pdfs')
         elif output_dir is None:
@@ -22,6 +42,7 @@ class PDFFromDOI:
         os.makedirs(self.output_dir, exist_ok=True)
         self.brightdata_api_key = brightdata_api_key or os.environ.get("BRIGHT_WEB_UNLOCKER_KEY")
         self.unpaywall_email = unpaywall_email
+        self.client = client or HTTP
 
     def download(self, doi: str, filename: str = None) -> Optional[str]:
         path = os.path.join(self.output_dir, f"{self._sanitize_filename(filename or doi)}.pdf")
@@ -49,10 +70,11 @@ class PDFFromDOI:
     def _get_pdf_url_from_unpaywall(self, doi: str) -> str:
         base = "https://api.unpaywall.org/v2/"
         url = f"{base}{urllib.parse.quote(doi)}?{urllib.parse.urlencode({'email': self.unpaywall_email})}"
-        req = urllib.request.Request(url)
         try:
-            with urllib.request.urlopen(req, timeout=15) as resp:
-                data = json.loads(resp.read().decode("utf-8"))
+            with _host_slot(url):
+                resp = self.client.get(url, timeout=15)
+            resp.raise_for_status()
+            data = resp.json()
         except Exception as e:
             raise RuntimeError(f"Unpaywall lookup failed for DOI: {doi}") from e
         best = data.get("best_oa_location") or {}
@@ -65,16 +87,17 @@ class PDFFromDOI:
     def _download_pdf_via_brightdata(self, pdf_url: str, out_path: str) -> bool:
         if not self.brightdata_api_key:
             return False
-        body = json.dumps({"zone": "web_unlocker1", "url": pdf_url, "format": "raw"}).encode("utf-8")
-        req = urllib.request.Request(
-            "https://api.brightdata.com/request",
-            data=body,
-            headers={"Authorization": f"Bearer {self.brightdata_api_key}", "Content-Type": "application/json"},
-            method="POST",
-        )
+        url = "https://api.brightdata.com/request"
         try:
-            with urllib.request.urlopen(req, timeout=60) as resp, open(out_path, "wb") as f:
-                f.write(resp.read())
+            with _host_slot(url), self.client.stream(
+                "POST",
+                url,
+                json={"zone": "web_unlocker1", "url": pdf_url, "format": "raw"},
+                headers={"Authorization": f"Bearer {self.brightdata_api_key}"},
+                timeout=60,
+            ) as resp:
+                resp.raise_for_status()
+                self._stream_to_file(resp, out_path)
             return True
         except Exception:
             return False
@@ -82,13 +105,29 @@ class PDFFromDOI:
     def _download_pdf_direct(self, pdf_url: str, out_path: str) -> bool:
         """Direct download fallback for open-access PDFs"""
         try:
-            req = urllib.request.Request(pdf_url, headers={"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"})
-            with urllib.request.urlopen(req, timeout=30) as resp, open(out_path, "wb") as f:
-                f.write(resp.read())
+            headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
+            with _host_slot(pdf_url), self.client.stream("GET", pdf_url, headers=headers, timeout=30) as resp:
+                resp.raise_for_status()
+                self._stream_to_file(resp, out_path)
             return True
         except Exception:
             return False
 
+    def _stream_to_file(self, resp: httpx.Response, out_path: str) -> None:
+        """Copy response body to disk in chunks, aborting past MAX_PDF_BYTES"""
+        size = 0
+        try:
+            with open(out_path, "wb") as f:
+                for chunk in resp.iter_bytes(CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > MAX_PDF_BYTES:
+                        raise RuntimeError(f"PDF exceeds {MAX_PDF_BYTES} bytes")
+                    f.write(chunk)
+        except Exception:
+            if os.path.exists(out_path):
+                os.remove(out_path)
+            raise
+
     def _is_arxiv_doi(self, doi: str) -> bool:
         """Check if DOI is from arXiv (format: 10.48550/arXiv.XXXX)"""
         return doi.startswith("10.48550/arXiv.")
@@ -0,0 +1,11 @@
+import httpx
+
+
+# Process-wide client so PubMed, Unpaywall and PDF hosts reuse pooled
+# keep-alive (and HTTP/2) connections instead of a new TLS handshake per call
+HTTP = httpx.Client(
+    limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+    http2=True,
+    timeout=30,
+    follow_redirects=True,
+)
@@ -19,6 +19,9 @@ pubmed_api = PubMedAPI()
 pdf_from_doi = PDFFromDOI()
 interaction_storage = InteractionStorage()
 
+# Extractor tool results re-sent in full; older ones are replaced by a one-line summary
+MAX_FULL_TOOL_MESSAGES = 4
+
 # State definition
 class GraphState(TypedDict):
     variable_of_interest: str
@@ -224,6 +227,8 @@ Paper content:
     count = state.get("interactions_count", 0)
     max_iterations = 20  # Safety limit
     iteration = 0
+    # (ToolMessage, summary) pairs, oldest first, for compacting history
+    tool_history = []
     
     # Loop until extraction is complete
     while not extraction_complete and iteration < max_iterations:
@@ -245,18 +250,21 @@ Paper content:
                     try:
                         result = submit_interactions.invoke(tool_call['args'])
                         # Count the number of interactions submitted
-                        count += len(tool_call['args'].get('interactions', []))
+                        submitted = len(tool_call['args'].get('interactions', []))
+                        count += submitted
                         tool_messages.append({
                             "role": "tool",
                             "content": result,
-                            "tool_call_id": tool_call['id']
+                            "tool_call_id": tool_call['id'],
+                            "summary": f"(previous batch: {submitted} interaction(s) submitted)"
                         })
                     except Exception as e:
                         print(f"  ✗ Failed to submit interaction: {e}")
                         tool_messages.append({
                             "role": "tool",
                             "content": f"Error: {e}",
-                            "tool_call_id": tool_call['id']
+                            "tool_call_id": tool_call['id'],
+                            "summary": "(previous batch: failed)"
                         })
                 
                 elif tool_name == 'finish_extraction':
@@ -265,13 +273,20 @@ Paper content:
                     tool_messages.append({
                         "role": "tool",
                         "content": result,
-                        "tool_call_id": tool_call['id']
+                        "tool_call_id": tool_call['id'],
+                        "summary": result
                     })
             
             # Add tool responses to message history
             from langchain_core.messages import ToolMessage
             for tm in tool_messages:
-                messages.append(ToolMessage(content=tm["content"], tool_call_id=tm["tool_call_id"]))
+                message = ToolMessage(content=tm["content"], tool_call_id=tm["tool_call_id"])
+                messages.append(message)
+                tool_history.append((message, tm["summary"]))
+            
+            # The paper is re-sent every turn, so keep earlier tool results short
+            for message, summary in tool_history[:-MAX_FULL_TOOL_MESSAGES]:
+                message.content = summary
         else:
             # No tool calls - prompt to continue
             print("  No tool calls, prompting to continue or finish...")
@@ -0,0 +1,11 @@
+import pymupdf
+import pymupdf4llm
+
+
+def pdf_to_markdown(path: str) -> str:
+    """Convert a PDF to markdown text without extracting images.
+
+    Kept free of Django imports so it can run in a worker process.
+    """
+    with pymupdf.open(path) as doc:
+        return pymupdf4llm.to_markdown(doc, page_chunks=False, write_images=False)
@@ -1,22 +1,74 @@
-import urllib.request
+import functools
+import os
+import threading
+import time
 import urllib.parse
 import xml.etree.ElementTree as ET
 from typing import Optional
 
+import httpx
+
+from .http_client import HTTP
+
+
+class _RateLimiter:
+    """Token bucket allowing `rate` requests per second"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                time.sleep((1 - self.tokens) / self.rate)
+
+
+# E-utilities allow 10 requests/s with an API key and 3/s without
+_keyed_limiter = _RateLimiter(10)
+_anonymous_limiter = _RateLimiter(3)
+
 
 class PubMedAPI:
-    def __init__(self, email: str = "test@google.com", tool: str = "research_agent"):
+    def __init__(self, email: str = "test@google.com", tool: str = "research_agent", api_key: Optional[str] = None, client: Optional[httpx.Client] = None):
         self.email = email
         self.tool = tool
+        self.api_key = api_key or os.environ.get("NCBI_API_KEY")
         self.base_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+        self._limiter = _keyed_limiter if self.api_key else _anonymous_limiter
+        self.client = client or HTTP
 
     def search(self, query: str, max_results: int = 100, meta_analysis_only: bool = False) -> list[dict]:
         if meta_analysis_only:
             query = f'({query}) AND "meta-analysis"[Publication Type]'
+        return list(self._cached_search(query, max_results))
+
+    @functools.lru_cache(maxsize=1024)
+    def _cached_search(self, query: str, max_results: int) -> tuple[dict, ...]:
         pmids = self._search_pmids(query, max_results)
         if not pmids:
-            return []
-        return self._fetch_details(pmids)
+            return ()
+        return tuple(self._fetch_details(pmids))
+
+    def _common_params(self) -> dict:
+        params = {"email": self.email, "tool": self.tool}
+        if self.api_key:
+            params["api_key"] = self.api_key
+        return params
+
+    def _get(self, url: str, timeout: int) -> ET.Element:
+        self._limiter.acquire()
+        resp = self.client.get(url, timeout=timeout)
+        resp.raise_for_status()
+        return ET.fromstring(resp.content)
 
     def _search_pmids(self, query: str, max_results: int) -> list[str]:
         params = urllib.parse.urlencode({
@@ -24,12 +76,10 @@ class PubMedAPI:
             "term": query,
             "retmax": max_results,
             "retmode": "xml",
-            "email": self.email,
-            "tool": self.tool
+            **self._common_params()
         })
         url = f"{self.base_url}/esearch.fcgi?{params}"
-        with urllib.request.urlopen(url, timeout=30) as resp:
-            root = ET.fromstring(resp.read().decode("utf-8"))
+        root = self._get(url, timeout=30)
         return [id_elem.text for id_elem in root.findall(".//Id")]
 
     def _fetch_details(self, pmids: list[str]) -> list[dict]:
@@ -37,12 +87,10 @@ class PubMedAPI:
             "db": "pubmed",
             "id": ",".join(pmids),
             "retmode": "xml",
-            "email": self.email,
-            "tool": self.tool
+            **self._common_params()
         })
         url = f"{self.base_url}/efetch.fcgi?{params}"
-        with urllib.request.urlopen(url, timeout=60) as resp:
-            root = ET.fromstring(resp.read().decode("utf-8"))
+        root = self._get(url, timeout=60)
         return [self._parse_article(art) for art in root.findall(".//PubmedArticle")]
 
     def _parse_article(self, article: ET.Element) -> dict:
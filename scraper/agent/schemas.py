@@ -0,0 +1,13 @@
+from pydantic import BaseModel, Field
+
+
+class ExtractedInteraction(BaseModel):
+    """A causal relationship reported by an intervention study"""
+    iv: str = Field(description="Independent variable: what was manipulated")
+    dv: str = Field(description="Dependent variable: what was measured")
+    effect: str = Field(description="'+' if IV increases DV, '-' if IV decreases DV")
+
+
+class InteractionList(BaseModel):
+    """All interactions extracted from one paper"""
+    interactions: list[ExtractedInteraction] = Field(default_factory=list)
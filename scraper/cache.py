@@ -0,0 +1,80 @@
+"""
+Cached aggregates for the scraper views
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max, Sum
+
+from .models import Interaction, ScraperJob
+
+
+# Invalidation reaches other processes only through a shared backend; with the
+# per-process default, entries have to expire quickly instead
+SHARED_CACHE = not settings.CACHES['default']['BACKEND'].endswith('LocMemCache')
+
+# Seconds a cached value may lag behind changes the invalidation didn't reach
+INTERACTION_TOTAL_TTL = 30 if SHARED_CACHE else 10
+HAS_INTERACTIONS_TTL = 60 if SHARED_CACHE else 10
+WORKSPACES_TTL = 300 if SHARED_CACHE else 5
+_WORKSPACES_KEY = 'scraper:workspace_summaries'
+
+
+def _interaction_total_key(workspace: str) -> str:
+    return f'scraper:interaction_total:{workspace}'
+
+
+def interaction_total(workspace: str) -> int:
+    """Number of valid (+/-) interactions in a workspace"""
+    return cache.get_or_set(_interaction_total_key(workspace), lambda: _count_interactions(workspace), INTERACTION_TOTAL_TTL)
+
+
+def _count_interactions(workspace: str) -> int:
+    # Each row is counted from exactly one source: jobs keep a running count of
+    # their linked valid interactions (reconciled by migration 0012), and only
+    # rows migration 0012 could not link to a job are scanned
+    from_jobs = ScraperJob.objects.filter(workspace=workspace).aggregate(total=Sum('interactions_found'))['total'] or 0
+    unlinked = Interaction.objects.filter(workspace=workspace, job__isnull=True, effect__in=['+', '-']).count()
+    return from_jobs + unlinked
+
+
+def _has_interactions_key(workspace: str) -> str:
+    return f'scraper:has_interactions:{workspace}'
+
+
+def has_interactions(workspace: str) -> bool:
+    """Whether a workspace has any stored interactions"""
+    return cache.get_or_set(
+        _has_interactions_key(workspace),
+        lambda: Interaction.objects.filter(workspace=workspace).exists(),
+        HAS_INTERACTIONS_TTL,
+    )
+
+
+def invalidate_interaction_stats(workspace: str) -> None:
+    """Drop cached interaction aggregates after interactions are added or deleted"""
+    cache.delete_many([_interaction_total_key(workspace), _has_interactions_key(workspace)])
+
+
+def workspace_summaries() -> list[dict]:
+    """Job count and latest job start per workspace, 'default' first"""
+    return cache.get_or_set(_WORKSPACES_KEY, _load_workspace_summaries, WORKSPACES_TTL)
+
+
+def all_workspaces() -> list[str]:
+    """Names of all workspaces that have jobs, plus 'default'"""
+    return [summary['workspace'] for summary in workspace_summaries()]
+
+
+def _load_workspace_summaries() -> list[dict]:
+    # One GROUP BY over the workspace index; order_by() drops the default
+    # ordering, which would otherwise be added to the grouping
+    summaries = {
+        row['workspace']: row
+        for row in ScraperJob.objects.order_by().values('workspace').annotate(job_count=Count('id'), last_started=Max('started_at'))
+    }
+    summaries.setdefault('default', {'workspace': 'default', 'job_count': 0, 'last_started': None})
+    return sorted(summaries.values(), key=lambda s: (s['workspace'] != 'default', s['workspace']))
+
+
+def invalidate_workspaces() -> None:
+    cache.delete(_WORKSPACES_KEY)
@@ -0,0 +1,17 @@
+"""
+Forms validating the scraper API's JSON request bodies
+"""
+from django import forms
+
+
+class StartJobForm(forms.Form):
+    variable_of_interest = forms.CharField(max_length=500, error_messages={'required': 'Variable of interest is required'})
+    min_interactions = forms.IntegerField(min_value=1, required=False)
+
+    def clean_min_interactions(self):
+        value = self.cleaned_data['min_interactions']
+        return 5 if value is None else value
+
+
+class SwitchWorkspaceForm(forms.Form):
+    workspace = forms.CharField(max_length=100, error_messages={'required': 'Workspace name is required'})
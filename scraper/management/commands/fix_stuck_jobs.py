@@ -37,7 +37,7 @@ class Command(BaseCommand):
             job.error_message = f'Job was stuck in running state for more than {hours} hours'
             job.completed_at = timezone.now()
             job.add_log(f'Job marked as failed (stuck for {hours}+ hours)')
-            job.save()
+            job.save(update_fields=['status', 'error_message', 'completed_at'])
             self.stdout.write(
                 self.style.WARNING(f'Marked job {job.id} ({job.variable_of_interest}) as failed')
             )
@@ -0,0 +1,32 @@
+"""
+Middleware for the scraper app
+"""
+import logging
+
+from django.core.exceptions import BadRequest, PermissionDenied, SuspiciousOperation
+from django.http import Http404, JsonResponse
+
+logger = logging.getLogger(__name__)
+
+
+class JsonApiErrorMiddleware:
+    """Answer unhandled errors in the scraper JSON API with {'error': ...} instead of an HTML page"""
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        return self.get_response(request)
+    
+    def process_exception(self, request, exception):
+        if '/api/' not in request.path or isinstance(exception, (Http404, PermissionDenied)):
+            return None
+        if isinstance(exception, BadRequest):
+            # Raised on purpose with a message meant for the client
+            return JsonResponse({'error': str(exception)}, status=400)
+        if isinstance(exception, SuspiciousOperation):
+            logger.warning('Suspicious request to %s: %s', request.path, exception)
+            return JsonResponse({'error': 'Bad request'}, status=400)
+        # Keep internals (DB errors, file paths) out of the response, but not out of the logs
+        logger.exception('Unhandled error in %s %s', request.method, request.path)
+        return JsonResponse({'error': 'Internal server error'}, status=500)
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-15 22:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0005_interaction_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DOICache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('doi', models.CharField(max_length=500, unique=True)),
+                ('status', models.CharField(choices=[('downloaded', 'Downloaded'), ('paywalled', 'Paywalled'), ('unavailable', 'Unavailable')], max_length=20)),
+                ('pdf_path', models.CharField(blank=True, max_length=1000)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-15 23:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0006_doicache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scraperjob',
+            name='checkpoint',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
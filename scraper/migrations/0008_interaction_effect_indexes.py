@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-15 23:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0007_scraperjob_checkpoint'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='interaction',
+            index=models.Index(fields=['workspace', 'effect'], name='scraper_int_workspa_c7a8bf_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='interaction',
+            index=models.Index(fields=['job', 'effect'], name='scraper_int_job_id_54871f_idx'),
+        ),
+    ]
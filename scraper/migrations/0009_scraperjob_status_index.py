@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-15 23:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0008_interaction_effect_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='scraperjob',
+            index=models.Index(fields=['status', 'started_at'], name='scraper_scr_status_19b8d1_idx'),
+        ),
+    ]
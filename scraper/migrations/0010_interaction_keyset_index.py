@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-15 23:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0009_scraperjob_status_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='interaction',
+            name='scraper_int_workspa_117cf4_idx',
+        ),
+        migrations.AddIndex(
+            model_name='interaction',
+            index=models.Index(fields=['workspace', '-created_at', '-id'], name='scraper_int_workspa_5f74b8_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-16 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0010_interaction_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scraperjob',
+            name='lease_expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.7 on 2026-10-16 09:40
+
+from collections import defaultdict
+
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def reconcile_interactions_found(apps, schema_editor):
+    """Link pre-0005 interactions to their job and make interactions_found count linked rows only"""
+    Interaction = apps.get_model('scraper', 'Interaction')
+    ScraperJob = apps.get_model('scraper', 'ScraperJob')
+    
+    # A job-less row belongs to the job whose run covered its creation, if exactly one did
+    owners = {}
+    for job in ScraperJob.objects.order_by().values('id', 'workspace', 'started_at', 'completed_at').iterator():
+        window = Interaction.objects.filter(job__isnull=True, workspace=job['workspace'], created_at__gte=job['started_at'])
+        if job['completed_at']:
+            window = window.filter(created_at__lte=job['completed_at'])
+        for pk in window.values_list('id', flat=True).iterator():
+            owners[pk] = None if pk in owners else job['id']
+    rows_by_job = defaultdict(list)
+    for pk, job_id in owners.items():
+        if job_id is not None:
+            rows_by_job[job_id].append(pk)
+    for job_id, pks in rows_by_job.items():
+        for start in range(0, len(pks), 500):
+            Interaction.objects.filter(pk__in=pks[start:start + 500]).update(job_id=job_id)
+    
+    # Rows still without a job (their job was deleted before 0005, or ownership is
+    # ambiguous) are counted separately, so the counters must not include them
+    linked = (
+        Interaction.objects.filter(job=OuterRef('pk'), effect__in=['+', '-'])
+        .order_by().values('job').annotate(n=Count('id')).values('n')
+    )
+    ScraperJob.objects.update(interactions_found=Coalesce(Subquery(linked), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0011_scraperjob_lease_expires_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(reconcile_interactions_found, migrations.RunPython.noop),
+    ]
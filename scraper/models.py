@@ -1,4 +1,6 @@
+from datetime import timedelta
 from django.db import models
+from django.db.models import Q
 from django.utils import timezone
 
 
@@ -16,7 +18,9 @@ class Interaction(models.Model):
     class Meta:
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['workspace', '-created_at']),
+            models.Index(fields=['workspace', '-created_at', '-id']),
+            models.Index(fields=['workspace', 'effect']),
+            models.Index(fields=['job', 'effect']),
         ]
     
     def __str__(self):
@@ -44,22 +48,87 @@ class ScraperJob(models.Model):
     started_at = models.DateTimeField(default=timezone.now)
     completed_at = models.DateTimeField(null=True, blank=True)
     stop_requested = models.BooleanField(default=False)
+    checkpoint = models.JSONField(default=dict, blank=True)  # checked_dois/tried_queries for resuming
+    lease_expires_at = models.DateTimeField(null=True, blank=True)  # Celery worker claim, renewed while the job runs
     
     class Meta:
         ordering = ['-started_at']
         indexes = [
             models.Index(fields=['workspace', '-started_at']),
+            models.Index(fields=['status', 'started_at']),
         ]
     
     def __str__(self):
         return f"Job {self.id}: {self.variable_of_interest} ({self.status})"
     
-    def add_log(self, message):
-        """Add a log entry with timestamp"""
+    @staticmethod
+    def log_entry(message):
+        """Format a log line with timestamp"""
         from datetime import datetime
         timestamp = datetime.now().strftime("%H:%M:%S")
-        log_entry = f"[{timestamp}] {message}\n"
-        self.logs += log_entry
+        return f"[{timestamp}] {message}\n"
+    
+    def add_log(self, message):
+        """Add a log entry with timestamp"""
+        self.logs += self.log_entry(message)
         self.current_step = message
         self.save(update_fields=['logs', 'current_step'])
 
+
+
+class DOICache(models.Model):
+    """Remembers PDF lookup outcomes per DOI so later jobs can skip repeat lookups"""
+    STATUS_CHOICES = [
+        ('downloaded', 'Downloaded'),
+        ('paywalled', 'Paywalled'),
+        ('unavailable', 'Unavailable'),
+    ]
+    # How long a negative result is trusted before the DOI is tried again
+    NEGATIVE_TTL = {
+        'paywalled': timedelta(days=30),
+        'unavailable': timedelta(days=1),
+    }
+    
+    doi = models.CharField(max_length=500, unique=True)  # normalized
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+    pdf_path = models.CharField(max_length=1000, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.doi} ({self.status})"
+    
+    @staticmethod
+    def normalize(doi: str) -> str:
+        return doi.strip().lower().removeprefix("https://doi.org/")
+    
+    @classmethod
+    def record(cls, doi: str, status: str, pdf_path: str = ''):
+        cls.objects.update_or_create(
+            doi=cls.normalize(doi),
+            defaults={'status': status, 'pdf_path': pdf_path},
+        )
+    
+    @classmethod
+    def record_failure(cls, doi: str, status: str):
+        """Record a negative lookup result without overwriting a downloaded PDF"""
+        entry, created = cls.objects.get_or_create(doi=cls.normalize(doi), defaults={'status': status})
+        if not created and entry.status != 'downloaded':
+            entry.status = status
+            entry.pdf_path = ''
+            entry.save(update_fields=['status', 'pdf_path', 'updated_at'])
+    
+    @classmethod
+    def negative_dois(cls, dois) -> set[str]:
+        """Normalized DOIs among dois with a still-valid negative result"""
+        now = timezone.now()
+        recent = Q()
+        for status, ttl in cls.NEGATIVE_TTL.items():
+            recent |= Q(status=status, updated_at__gte=now - ttl)
+        normalized = [cls.normalize(doi) for doi in dois]
+        return set(cls.objects.filter(recent, doi__in=normalized).values_list('doi', flat=True))
+    
+    @classmethod
+    def downloaded_paths(cls, dois) -> dict[str, str]:
+        """Map normalized DOI to local PDF path for previously downloaded DOIs"""
+        normalized = [cls.normalize(doi) for doi in dois]
+        return dict(cls.objects.filter(status='downloaded', doi__in=normalized).values_list('doi', 'pdf_path'))
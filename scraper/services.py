@@ -1,25 +1,148 @@
 """
 Django service for running the scraper agent
 """
+import asyncio
+import functools
+import inspect
+import logging
+import os
+import re
 import threading
+import time
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
 from typing import Optional
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.db.models import F, Q, Value
+from django.db.models.functions import Concat
 from django.utils import timezone
-from .models import Interaction, ScraperJob
+from .cache import invalidate_interaction_stats
+from .models import DOICache, Interaction, ScraperJob
 from .agent.paperfinder import GraphState, StateGraph, START, END
 from .agent.pubmed import PubMedAPI
 from .agent.doi2pdf import PDFFromDOI
 
 try:
     from langchain_nebius import ChatNebius
-    from langchain_core.messages import SystemMessage, HumanMessage, ToolMessage
-    from langchain_core.tools import tool
-    import pymupdf4llm
+    from langchain_core.messages import SystemMessage, HumanMessage
+    from .agent.schemas import InteractionList
+    from .agent.pdf2md import pdf_to_markdown
+    from langchain_core.runnables import RunnableConfig
     from typing_extensions import Annotated
     from typing import Literal
     LANGCHAIN_AVAILABLE = True
 except ImportError:
     LANGCHAIN_AVAILABLE = False
 
+logger = logging.getLogger(__name__)
+
+
+# Max concurrent LLM calls when classifying a batch of abstracts
+ABSTRACT_BATCH_CONCURRENCY = 16
+# Small model for the yes/no abstract check; query writing and extraction keep the large one
+ABSTRACT_CLASSIFIER_MODEL = "meta-llama/Meta-Llama-3.1-8B-Instruct"
+
+# Accepted spellings of interaction effects
+_POSITIVE_EFFECTS = frozenset({'+', 'increase', 'increases', 'increased', 'up', 'positive', 'pos', 'inc'})
+_NEGATIVE_EFFECTS = frozenset({'-', 'decrease', 'decreases', 'decreased', 'down', 'negative', 'neg', 'dec'})
+
+# Paper text sent to the extractor
+MAX_PAPER_CHARS = 20000
+_BACK_MATTER_RE = re.compile(r'^#+[\s*_]*(?:[\d.]+\s*)?(references|bibliography|acknowledg|article information)', re.I | re.M)
+_REFERENCE_LINE_RE = re.compile(r'^\s*\[\d+\].*\n?', re.M)
+_HEADING_RE = re.compile(r'^(#+)\s*(.*)$', re.M)
+_KEPT_SECTION_RE = re.compile(r'abstract|method|material|result|discussion|conclusion', re.I)
+
+# PDF prefetching for relevant papers
+PDF_DOWNLOAD_WORKERS = 16
+PDF_DOWNLOAD_TIMEOUT = 300  # seconds to wait for a prefetched PDF
+
+# Shared across jobs so repeated queries hit PubMedAPI's response cache
+pubmed_api = PubMedAPI()
+
+# PDF to markdown conversion is CPU-bound, so it runs in worker processes
+_cpu_pool: Optional[ProcessPoolExecutor] = None
+_cpu_pool_lock = threading.Lock()
+
+
+def _get_cpu_pool() -> ProcessPoolExecutor:
+    """Process pool shared by all jobs, created on first use"""
+    global _cpu_pool
+    with _cpu_pool_lock:
+        if _cpu_pool is None:
+            # Spawn rather than fork: the server process is multi-threaded
+            _cpu_pool = ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=multiprocessing.get_context("spawn"))
+        return _cpu_pool
+
+
+def _reset_cpu_pool(broken: ProcessPoolExecutor):
+    """Drop a pool whose worker died; every later submit to it would fail"""
+    global _cpu_pool
+    with _cpu_pool_lock:
+        # Another job may already have replaced it
+        if _cpu_pool is broken:
+            _cpu_pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+async def _run_in_cpu_pool(fn, *args):
+    """Run fn in the shared process pool, replacing the pool and retrying once if it broke"""
+    loop = asyncio.get_running_loop()
+    pool = _get_cpu_pool()
+    try:
+        return await loop.run_in_executor(pool, fn, *args)
+    except BrokenProcessPool:
+        _reset_cpu_pool(pool)
+        return await loop.run_in_executor(_get_cpu_pool(), fn, *args)
+
+# Stop flags for jobs running in this process, set by signal_local_job_stop()
+_JOB_STOP_EVENTS: dict[int, threading.Event] = {}
+# Seconds between DB checks for stops requested from another process
+STOP_POLL_INTERVAL = 5
+# Seconds between writes of buffered log lines to the job
+LOG_FLUSH_INTERVAL = 1
+# Papers between saves of resumable progress to ScraperJob.checkpoint
+CHECKPOINT_EVERY = 5
+# Seconds a worker's claim on a job lasts without renewal, and between renewals
+JOB_LEASE_SECONDS = 120
+JOB_LEASE_RENEW_INTERVAL = 30
+
+
+def _condense_paper(md: str) -> str:
+    """Keep the parts of a paper that report findings.
+
+    Drops everything from the references/acknowledgments onward and numbered
+    reference lines, then keeps the text before the first heading plus the
+    abstract, methods, results, discussion and conclusion sections (with
+    their subsections). Papers without recognisable section headings are
+    returned whole apart from the back matter.
+    """
+    back_matter = _BACK_MATTER_RE.search(md)
+    if back_matter:
+        md = md[:back_matter.start()]
+    md = _REFERENCE_LINE_RE.sub('', md)
+    
+    headings = list(_HEADING_RE.finditer(md))
+    if not any(_KEPT_SECTION_RE.search(h.group(2)) for h in headings):
+        return md
+    
+    parts = [md[:headings[0].start()]]
+    keep_level = None
+    for i, heading in enumerate(headings):
+        level = len(heading.group(1))
+        if _KEPT_SECTION_RE.search(heading.group(2)):
+            keep_level = level if keep_level is None else min(keep_level, level)
+        elif keep_level is not None and level <= keep_level:
+            keep_level = None
+        if keep_level is not None:
+            end = headings[i + 1].start() if i + 1 < len(headings) else len(md)
+            parts.append(md[heading.start():end])
+    return ''.join(parts)
+
 
 class ScraperService:
     """Service to run the scraper agent and update Django models"""
@@ -30,158 +153,209 @@ class ScraperService:
             raise ImportError("LangChain dependencies not installed")
         
         self.llm = ChatNebius(model="moonshotai/Kimi-K2-Instruct")
-        self.pubmed_api = PubMedAPI()
+        self.classifier_llm = ChatNebius(model=ABSTRACT_CLASSIFIER_MODEL, temperature=0, max_tokens=2)
+        self.pubmed_api = pubmed_api
         self.pdf_from_doi = PDFFromDOI()
+        self._pdf_pool = ThreadPoolExecutor(max_workers=PDF_DOWNLOAD_WORKERS, thread_name_prefix=f"pdf-job-{job_id}")
+        self._pdf_futures: dict[str, Future] = {}
+        self._stop_event = _JOB_STOP_EVENTS.setdefault(job_id, threading.Event())
+        self._last_stop_poll = 0.0
         self._stopped = False
+        self._papers_since_checkpoint = 0
+        self._last_lease_renewal = time.monotonic()
+        self._log_buf: list[str] = []
+        self._log_lock = threading.Lock()
+        self._log_done = threading.Event()
+        self._log_flusher = threading.Thread(target=self._flush_logs_periodically, daemon=True, name=f"logs-job-{job_id}")
 
     class JobStoppedException(Exception):
         pass
 
     def _check_stopped(self):
-        """Refresh from DB and raise if stop was requested."""
-        # Refresh job to get latest stop flag
-        self.job.refresh_from_db(fields=["stop_requested"]) 
-        if self.job.stop_requested:
+        """Raise if stop was requested."""
+        # The stop view sets the in-process event; fall back to an occasional
+        # DB refresh for stops requested from another process
+        now = time.monotonic()
+        if not self._stop_event.is_set() and now - self._last_stop_poll >= STOP_POLL_INTERVAL:
+            self._last_stop_poll = now
+            self.job.refresh_from_db(fields=["stop_requested"])
+            if self.job.stop_requested:
+                self._stop_event.set()
+        if self._stop_event.is_set():
             self._stopped = True
             raise ScraperService.JobStoppedException("Job stopped by user")
     
     def update_status(self, step: str, message: str = ""):
         """Update job status and add to logs"""
-        log_message = f"[{step}] {message}"
-        print(f"[Job {self.job.id}] {log_message}")
-        self.job.add_log(log_message)
+        self._log(f"[{step}] {message}")
+    
+    def _log(self, message: str):
+        """Buffer a log line; the flusher thread appends it to the job"""
+        if settings.DEBUG:
+            print(f"[Job {self.job.id}] {message}")
+        entry = ScraperJob.log_entry(message)
+        with self._log_lock:
+            self._log_buf.append(entry)
+    
+    def _flush_logs(self):
+        """Append buffered log lines to the job in one UPDATE"""
+        with self._log_lock:
+            entries, self._log_buf = self._log_buf, []
+        if not entries:
+            return
+        # current_step mirrors the last message, as in ScraperJob.add_log
+        last_message = entries[-1].split("] ", 1)[1].rstrip("\n")
+        try:
+            ScraperJob.objects.filter(pk=self.job.pk).update(
+                logs=Concat('logs', Value(''.join(entries))),
+                current_step=last_message,
+            )
+        except Exception:
+            # Put the lines back so the next flush writes them
+            with self._log_lock:
+                self._log_buf[:0] = entries
+            raise
+    
+    def _flush_logs_periodically(self):
+        try:
+            while not self._log_done.wait(LOG_FLUSH_INTERVAL):
+                # A failed write (e.g. "database is locked") must not end the
+                # thread, or logging and the lease renewal stop for the whole job
+                try:
+                    self._flush_logs()
+                except Exception:
+                    logger.exception("Flushing logs for job %s failed", self.job.pk)
+                try:
+                    self._renew_lease()
+                except Exception:
+                    logger.exception("Renewing the lease on job %s failed", self.job.pk)
+        finally:
+            # close_old_connections() would keep it open for CONN_MAX_AGE; this thread is done with it
+            connection.close()
     
-    def add_interaction(self, iv: str, dv: str, effect: str, doi: str, pub_date: str):
-        """Add interaction to database"""
-        normalized = self._normalize_effect(effect)
-        if normalized is None:
-            # Skip non +/- effects
-            self.update_status("EXTRACT", f"✗ Skipping interaction with invalid effect '{effect}'")
+    def _renew_lease(self):
+        """Extend the worker's claim on this job so redeliveries see it is still alive"""
+        now = time.monotonic()
+        if now - self._last_lease_renewal < JOB_LEASE_RENEW_INTERVAL:
             return
-        Interaction.objects.create(
-            workspace=self.job.workspace,
-            job=self.job,
-            independent_variable=iv,
-            dependent_variable=dv,
-            effect=normalized,
-            reference=doi,
-            date_published=pub_date
+        # Only claimed (Celery) jobs have a lease; thread-run jobs are left alone
+        ScraperJob.objects.filter(pk=self.job.pk, lease_expires_at__isnull=False).update(
+            lease_expires_at=timezone.now() + timedelta(seconds=JOB_LEASE_SECONDS)
         )
-        self.job.interactions_found += 1
-        self.job.save(update_fields=['interactions_found'])
-        self.update_status("EXTRACT", f"💾 Found interaction: {iv} → {dv} ({normalized})")
+        # Only after success, so a failed renewal is retried on the next tick
+        self._last_lease_renewal = now
+    
+    def _close_logs(self):
+        """Stop the flusher thread and write any remaining log lines"""
+        self._log_done.set()
+        if self._log_flusher.is_alive():
+            self._log_flusher.join()
+        self._flush_logs()
+    
+    # Async node functions must not touch the ORM from the event loop
+    async def _acheck_stopped(self):
+        await sync_to_async(self._check_stopped)()
+    
+    async def _aupdate_status(self, step: str, message: str = ""):
+        # Only buffers in memory, so no thread hop is needed
+        self.update_status(step, message)
+    
+    def _store_interactions(self, interactions: list, doi: str, pub_date: str) -> int:
+        """Validate extracted interactions and save them in one query"""
+        to_create = []
+        for interaction in interactions:
+            normalized = self._normalize_effect(interaction.effect)
+            if normalized is None:
+                # Skip non +/- effects
+                self.update_status("EXTRACT", f"✗ Skipping interaction with invalid effect '{interaction.effect}'")
+                continue
+            to_create.append(Interaction(
+                workspace=self.job.workspace,
+                job=self.job,
+                independent_variable=interaction.iv,
+                dependent_variable=interaction.dv,
+                effect=normalized,
+                reference=doi,
+                date_published=pub_date
+            ))
+        if not to_create:
+            return 0
+        
+        with transaction.atomic():
+            Interaction.objects.bulk_create(to_create, batch_size=500)
+            ScraperJob.objects.filter(pk=self.job.pk).update(interactions_found=F('interactions_found') + len(to_create))
+        self.job.refresh_from_db(fields=['interactions_found'])
+        invalidate_interaction_stats(self.job.workspace)
+        for i in to_create:
+            self.update_status("EXTRACT", f"💾 Found interaction: {i.independent_variable} → {i.dependent_variable} ({i.effect})")
+        return len(to_create)
 
     def _normalize_effect(self, effect: str) -> Optional[str]:
-        if not effect:
-            return None
-        e = str(effect).strip().lower()
-        if e in ['+', 'increase', 'increases', 'increased', 'up', 'positive', 'pos', 'inc']:
-            return '+'
-        if e in ['-', 'decrease', 'decreases', 'decreased', 'down', 'negative', 'neg', 'dec']:
-            return '-'
-        return None
+        e = str(effect).strip().lower() if effect else ''
+        return '+' if e in _POSITIVE_EFFECTS else '-' if e in _NEGATIVE_EFFECTS else None
     
     def run(self):
         """Run the scraper agent"""
         try:
             self.job.status = 'running'
             self.job.save(update_fields=['status'])
+            self._log_flusher.start()
             self._check_stopped()
             
-            # Build and run the workflow
-            agent = self._build_workflow()
+            # Run the shared workflow with this service bound via config
+            agent = _get_compiled_agent()
             
-            result = agent.invoke(
+            # Resume from the last checkpoint if this job was interrupted
+            checkpoint = self.job.checkpoint or {}
+            if checkpoint:
+                self.update_status("STATUS", f"Resuming after {len(checkpoint.get('checked_dois', []))} checked papers")
+            
+            result = asyncio.run(agent.ainvoke(
                 {
                     "variable_of_interest": self.job.variable_of_interest,
-                    "interactions_count": 0,
+                    "interactions_count": self.job.interactions_found,
                     "min_interactions": self.job.min_interactions,
-                    "checked_dois": [],
-                    "tried_queries": []
+                    "checked_dois": checkpoint.get("checked_dois", []),
+                    "tried_queries": checkpoint.get("tried_queries", [])
                 },
-                {"recursion_limit": 400}
-            )
+                {"recursion_limit": 400, "configurable": {"service": self}}
+            ))
+            self._close_logs()
             
             # Update job
             self.job.status = 'completed'
             self.job.papers_checked = len(result.get('checked_dois', []))
             self.job.completed_at = timezone.now()
             self.job.current_step = f"Completed: {self.job.interactions_found} interactions from {self.job.papers_checked} papers"
-            self.job.save()
+            self.job.save(update_fields=['status', 'papers_checked', 'completed_at', 'current_step'])
         except ScraperService.JobStoppedException as e:
             # Mark as failed (stopped) and finish
             self.job.status = 'failed'
             self.job.error_message = 'Job stopped by user'
             self.job.completed_at = timezone.now()
-            self.job.add_log('Job stopped by user')
-            self.job.save()
+            self._log('Job stopped by user')
+            self._close_logs()
+            self.job.save(update_fields=['status', 'error_message', 'completed_at'])
             return
         except Exception as e:
+            self._close_logs()
             self.job.status = 'failed'
             self.job.error_message = str(e)
             self.job.completed_at = timezone.now()
-            self.job.save()
+            self.job.save(update_fields=['status', 'error_message', 'completed_at'])
             raise
-    
-    def _build_workflow(self):
-        """Build the LangGraph workflow"""
-        workflow = StateGraph(GraphState)
-        
-        # Add nodes
-        workflow.add_node("create_query", self._create_query)
-        workflow.add_node("search_pubmed", self._search_pubmed)
-        workflow.add_node("filter_papers", self._filter_papers)
-        workflow.add_node("check_abstract", self._check_abstract)
-        workflow.add_node("download_paper", self._download_paper)
-        workflow.add_node("extract_interactions", self._extract_interactions)
-        
-        # Add edges
-        workflow.add_edge(START, "create_query")
-        workflow.add_edge("create_query", "search_pubmed")
-        workflow.add_edge("search_pubmed", "filter_papers")
-        workflow.add_edge("filter_papers", "check_abstract")
-        
-        workflow.add_conditional_edges(
-            "check_abstract",
-            self._route_after_abstract,
-            {
-                "download_paper": "download_paper",
-                "check_abstract": "check_abstract",
-                "create_query": "create_query"
-            }
-        )
-        
-        workflow.add_conditional_edges(
-            "download_paper",
-            self._route_after_download,
-            {
-                "extract_interactions": "extract_interactions",
-                "check_abstract": "check_abstract",
-                "create_query": "create_query"
-            }
-        )
-        
-        workflow.add_conditional_edges(
-            "extract_interactions",
-            self._route_after_extraction,
-            {
-                "check_abstract": "check_abstract",
-                "create_query": "create_query",
-                END: END
-            }
-        )
-        
-        agent = workflow.compile()
-        return agent.with_config(recursion_limit=400)
+        finally:
+            self._pdf_pool.shutdown(wait=False, cancel_futures=True)
+            _JOB_STOP_EVENTS.pop(self.job.id, None)
     
     # Node functions (adapted from paperfinder.py)
-    def _create_query(self, state: GraphState) -> dict:
+    async def _create_query(self, state: GraphState) -> dict:
         """AI creates PubMed query from variable of interest"""
-        self._check_stopped()
+        await self._acheck_stopped()
         tried = state.get("tried_queries", [])
         
         if tried:
-            self.update_status("QUERY", f"Creating new query (tried {len(tried)} already)")
+            await self._aupdate_status("QUERY", f"Creating new query (tried {len(tried)} already)")
             previous_queries_text = "\n".join([f"  {i+1}. {q}" for i, q in enumerate(tried)])
             prompt = f"""Variable of interest: {state['variable_of_interest']}
 
@@ -191,134 +365,174 @@ Previously tried queries:
 These queries have been exhausted. Create a NEW, CREATIVE query that approaches the topic differently.
 Create a concise PubMed search query for intervention studies on human substrate."""
         else:
-            self.update_status("QUERY", f"Creating query for: {state['variable_of_interest']}")
+            await self._aupdate_status("QUERY", f"Creating query for: {state['variable_of_interest']}")
             prompt = f"""Variable of interest: {state['variable_of_interest']}
 Create a concise PubMed search query for finding intervention studies on human substrate about this variable."""
         
-        response = self.llm.invoke([
+        response = await self.llm.ainvoke([
             SystemMessage(content="You are an expert at crafting PubMed search queries for human intervention studies."),
             HumanMessage(content=prompt)
         ])
         
         query = response.content.strip()
-        self.update_status("QUERY", f"Generated: {query}")
+        await self._aupdate_status("QUERY", f"Generated: {query}")
         
         return {"query": query, "tried_queries": [query]}
     
-    def _search_pubmed(self, state: GraphState) -> dict:
+    async def _search_pubmed(self, state: GraphState) -> dict:
         """Search PubMed API"""
-        self._check_stopped()
-        self.update_status("PUBMED", f"Searching: {state['query']}")
-        papers = self.pubmed_api.search(state['query'], max_results=100)
-        self.update_status("PUBMED", f"Found {len(papers)} papers")
+        await self._acheck_stopped()
+        await self._aupdate_status("PUBMED", f"Searching: {state['query']}")
+        papers = await asyncio.to_thread(self.pubmed_api.search, state['query'], max_results=100)
+        await self._aupdate_status("PUBMED", f"Found {len(papers)} papers")
         return {"papers": papers}
     
     def _filter_papers(self, state: GraphState) -> dict:
         """Filter out already checked papers"""
         self._check_stopped()
         checked = state.get("checked_dois", [])
-        filtered = [p for p in state["papers"] if p.get("doi") and p["doi"] not in checked]
+        new_papers = [p for p in state["papers"] if p.get("doi") and p["doi"] not in checked]
+        # Skip DOIs that earlier jobs already found to have no usable PDF
+        known_missing = DOICache.negative_dois(p["doi"] for p in new_papers)
+        filtered = [p for p in new_papers if DOICache.normalize(p["doi"]) not in known_missing]
+        if len(filtered) < len(new_papers):
+            self.update_status("FILTER", f"Skipping {len(new_papers) - len(filtered)} papers without open-access PDF (cached)")
         self.update_status("FILTER", f"Filtered to {len(filtered)} new papers")
         return {"papers": filtered}
     
+    async def _classify_all_abstracts(self, state: GraphState) -> dict:
+        """AI checks all abstracts for relevance in one concurrent batch"""
+        await self._acheck_stopped()
+        papers = state["papers"]
+        if not papers:
+            return {"papers": []}
+        
+        await self._aupdate_status("ABSTRACT", f"Checking {len(papers)} abstracts")
+        
+        system_message = SystemMessage(content=f"You are evaluating if this paper is relevant to: {state['variable_of_interest']}. Check if it's an intervention study on human substrate. Reply with 'yes' or 'no'.")
+        responses = await self.classifier_llm.abatch(
+            [
+                [system_message, HumanMessage(content=f"Title: {paper.get('title', '')}\n\nAbstract: {paper.get('abstract', '')}")]
+                for paper in papers
+            ],
+            config={"max_concurrency": ABSTRACT_BATCH_CONCURRENCY},
+            return_exceptions=True,
+        )
+        
+        relevant = []
+        # Papers whose check failed (e.g. rate-limited) stay unchecked so a later search retries them
+        classified = []
+        for paper, response in zip(papers, responses):
+            if isinstance(response, Exception):
+                logger.warning("Abstract check failed for %s in job %s: %r", paper.get("doi"), self.job.pk, response)
+                await self._aupdate_status("ABSTRACT", f"✗ Check failed for '{paper.get('title', 'No title')}': {response}")
+                continue
+            classified.append(paper)
+            if response.content.strip().lower().startswith("y"):
+                relevant.append(paper)
+        
+        await self._aupdate_status("ABSTRACT", f"✓ {len(relevant)} of {len(classified)} papers are relevant")
+        await sync_to_async(self._prefetch_pdfs)(relevant)
+        return {"papers": relevant, "checked_dois": [paper.get("doi", "") for paper in classified]}
+    
+    def _prefetch_pdfs(self, papers: list[dict]):
+        """Start downloading PDFs for papers in the background"""
+        dois = [paper["doi"] for paper in papers if paper.get("doi")]
+        cached_paths = DOICache.downloaded_paths(dois)
+        for doi in dois:
+            if doi in self._pdf_futures:
+                continue
+            cached_path = cached_paths.get(DOICache.normalize(doi))
+            if cached_path and os.path.exists(cached_path):
+                future = Future()
+                future.set_result(cached_path)
+                self._pdf_futures[doi] = future
+            else:
+                self._pdf_futures[doi] = self._pdf_pool.submit(self.pdf_from_doi.download, doi)
+    
     def _check_abstract(self, state: GraphState) -> dict:
-        """AI checks if abstract is relevant"""
+        """Take the next relevant paper from the queue"""
         self._check_stopped()
+        self._papers_since_checkpoint += 1
+        if self._papers_since_checkpoint >= CHECKPOINT_EVERY:
+            self._save_checkpoint(state)
         if not state["papers"]:
             return {"current_paper": {}}
         
         paper = state["papers"][0]
-        remaining = state["papers"][1:]
         
         # Show full title in logs
         title = paper.get('title', 'No title')
-        self.update_status("ABSTRACT", f"Checking paper: '{title}'")
-        
-        response = self.llm.invoke([
-            SystemMessage(content=f"You are evaluating if this paper is relevant to: {state['variable_of_interest']}. Check if it's an intervention study on human substrate. Reply with 'yes' or 'no'."),
-            HumanMessage(content=f"Title: {paper.get('title', '')}\n\nAbstract: {paper.get('abstract', '')}")
-        ])
+        self.update_status("ABSTRACT", f"Next relevant paper: '{title}'")
         
-        is_relevant = response.content.strip().lower() in ["yes", "y"]
-        
-        if is_relevant:
-            self.update_status("ABSTRACT", f"✓ Paper is relevant! Will download.")
-            return {"papers": remaining, "current_paper": paper, "checked_dois": [paper.get("doi", "")]}
-        else:
-            self.update_status("ABSTRACT", f"✗ Not relevant. Skipping.")
-            return {"papers": remaining, "current_paper": {}, "checked_dois": [paper.get("doi", "")]}
+        return {"papers": state["papers"][1:], "current_paper": paper}
+    
+    def _save_checkpoint(self, state: GraphState):
+        """Persist what a resumed run needs to skip work already done"""
+        self._papers_since_checkpoint = 0
+        # Queued papers were classified but not processed yet, so a resume must revisit them
+        queued = {p.get("doi") for p in state.get("papers", [])}
+        ScraperJob.objects.filter(pk=self.job.pk).update(checkpoint={
+            "checked_dois": [d for d in state.get("checked_dois", []) if d not in queued],
+            "tried_queries": state.get("tried_queries", []),
+        })
     
-    def _download_paper(self, state: GraphState) -> dict:
+    async def _download_paper(self, state: GraphState) -> dict:
         """Download paper PDF and convert to markdown"""
-        self._check_stopped()
+        await self._acheck_stopped()
         paper = state["current_paper"]
         doi = paper.get("doi")
         
         if not doi:
             return {"paper_md": "", "current_paper": {}}
         
-        self.update_status("DOWNLOAD", f"📥 Downloading PDF for DOI: {doi}")
+        await self._aupdate_status("DOWNLOAD", f"📥 Downloading PDF for DOI: {doi}")
         
+        future = self._pdf_futures.pop(doi, None) or self._pdf_pool.submit(self.pdf_from_doi.download, doi)
         try:
-            path = self.pdf_from_doi.download(doi)
-            self.update_status("DOWNLOAD", f"✓ PDF downloaded successfully")
-            self.update_status("CONVERT", f"📄 Converting PDF to text...")
-            md = pymupdf4llm.to_markdown(str(path))
-            self.update_status("CONVERT", f"✓ Converted to text ({len(md):,} characters)")
-            return {"paper_md": md}
-        except FileNotFoundError as e:
-            self.update_status("DOWNLOAD", f"✗ Paper is paywalled (not open access). Skipping.")
+            path = await asyncio.wait_for(asyncio.wrap_future(future), PDF_DOWNLOAD_TIMEOUT)
+        except FileNotFoundError:
+            await sync_to_async(DOICache.record_failure)(doi, 'paywalled')
+            await self._aupdate_status("DOWNLOAD", f"✗ Paper is paywalled (not open access). Skipping.")
+            return {"paper_md": "", "current_paper": {}}
+        except asyncio.TimeoutError:
+            # Our own wait ran out; says nothing about the PDF, so don't cache it
+            await self._aupdate_status("DOWNLOAD", f"✗ Download timed out after {PDF_DOWNLOAD_TIMEOUT}s. Skipping.")
+            return {"paper_md": "", "current_paper": {}}
+        except Exception as e:
+            await sync_to_async(DOICache.record_failure)(doi, 'unavailable')
+            await self._aupdate_status("DOWNLOAD", f"✗ Download failed: {str(e)}")
             return {"paper_md": "", "current_paper": {}}
+        
+        await sync_to_async(DOICache.record)(doi, 'downloaded', str(path))
+        await self._aupdate_status("DOWNLOAD", f"✓ PDF downloaded successfully")
+        await self._aupdate_status("CONVERT", f"📄 Converting PDF to text...")
+        try:
+            md = await _run_in_cpu_pool(pdf_to_markdown, str(path))
         except Exception as e:
-            self.update_status("DOWNLOAD", f"✗ Download failed: {str(e)}")
+            # The PDF is on disk, so keep its 'downloaded' entry for other jobs
+            await self._aupdate_status("CONVERT", f"✗ Conversion failed: {str(e)}")
             return {"paper_md": "", "current_paper": {}}
+        await self._aupdate_status("CONVERT", f"✓ Converted to text ({len(md):,} characters)")
+        return {"paper_md": md}
     
-    def _extract_interactions(self, state: GraphState) -> dict:
+    async def _extract_interactions(self, state: GraphState) -> dict:
         """AI extracts interactions from paper"""
-        self._check_stopped()
+        await self._acheck_stopped()
         if not state["paper_md"]:
             return {"interactions_count": state.get("interactions_count", 0), "current_paper": {}, "paper_md": ""}
         
-        self.update_status("EXTRACT", "Extracting interactions")
+        await self._aupdate_status("EXTRACT", "Extracting interactions")
         
         doi = state['current_paper'].get('doi', '')
         pub_date = state['current_paper'].get('pub_date', '')
         
-        # Truncate paper to avoid token limit issues
-        # Rough estimate: 1 token ≈ 4 characters, we want to stay under 100k tokens
-        # so limit to about 400k characters (leaving room for prompts and responses)
-        paper_content = state['paper_md']
-        max_chars = 400000
-        if len(paper_content) > max_chars:
-            self.update_status("EXTRACT", f"Paper too long ({len(paper_content):,} chars), truncating to {max_chars:,} chars")
-            paper_content = paper_content[:max_chars] + "\n\n[... Paper truncated due to length ...]"
-        
-        extraction_complete = False
-        
-        # Create tools
-        @tool
-        def submit_interactions(interactions: list[dict]) -> str:
-            """Submit extracted interactions"""
-            count = 0
-            for interaction in interactions:
-                self.add_interaction(
-                    interaction['iv'],
-                    interaction['dv'],
-                    interaction['effect'],
-                    doi,
-                    pub_date
-                )
-                count += 1
-            return f"{count} interaction(s) submitted successfully."
-        
-        @tool
-        def finish_extraction() -> str:
-            """Call when finished extracting"""
-            nonlocal extraction_complete
-            extraction_complete = True
-            return "Extraction complete."
-        
-        llm_with_tools = self.llm.bind_tools([submit_interactions, finish_extraction])
+        # Only send the sections that report findings, capped to keep the prompt small
+        paper_content = _condense_paper(state['paper_md'])
+        await self._aupdate_status("EXTRACT", f"Condensed paper from {len(state['paper_md']):,} to {len(paper_content):,} chars")
+        if len(paper_content) > MAX_PAPER_CHARS:
+            await self._aupdate_status("EXTRACT", f"Paper too long ({len(paper_content):,} chars), truncating to {MAX_PAPER_CHARS:,} chars")
+            paper_content = paper_content[:MAX_PAPER_CHARS] + "\n\n[... Paper truncated due to length ...]"
         
         initial_prompt = f"""Analyze this paper and extract ALL intervention studies on human substrate.
 
@@ -329,60 +543,23 @@ For each experiment:
 - Dependent variable (DV): what was measured
 - Effect: '+' if IV increases DV, '-' if IV decreases DV
 
-Call submit_interactions with your findings, then call finish_extraction when done.
+Return every interaction you find, or an empty list if there are none.
 
 Paper content:
 {paper_content}"""
         
-        messages = [
-            SystemMessage(content="Extract ALL causal relationships. Call submit_interactions then finish_extraction."),
-            HumanMessage(content=initial_prompt)
-        ]
-        
-        count = state.get("interactions_count", 0)
-        max_iterations = 20
-        iteration = 0
-        
-        while not extraction_complete and iteration < max_iterations:
-            self._check_stopped()
-            iteration += 1
-            response = llm_with_tools.invoke(messages)
-            messages.append(response)
-            
-            if hasattr(response, 'tool_calls') and response.tool_calls:
-                tool_messages = []
-                for tool_call in response.tool_calls:
-                    tool_name = tool_call['name']
-                    
-                    if tool_name == 'submit_interactions':
-                        try:
-                            result = submit_interactions.invoke(tool_call['args'])
-                            count += len(tool_call['args'].get('interactions', []))
-                            tool_messages.append({
-                                "role": "tool",
-                                "content": result,
-                                "tool_call_id": tool_call['id']
-                            })
-                        except Exception as e:
-                            tool_messages.append({
-                                "role": "tool",
-                                "content": f"Error: {e}",
-                                "tool_call_id": tool_call['id']
-                            })
-                    
-                    elif tool_name == 'finish_extraction':
-                        result = finish_extraction.invoke({})
-                        tool_messages.append({
-                            "role": "tool",
-                            "content": result,
-                            "tool_call_id": tool_call['id']
-                        })
-                
-                for tm in tool_messages:
-                    messages.append(ToolMessage(content=tm["content"], tool_call_id=tm["tool_call_id"]))
-            else:
-                messages.append(HumanMessage(content="Continue or call finish_extraction."))
+        structured_llm = self.llm.with_structured_output(InteractionList)
+        try:
+            result = await structured_llm.ainvoke([
+                SystemMessage(content="Extract ALL causal relationships from the paper as a list of interactions."),
+                HumanMessage(content=initial_prompt)
+            ])
+        except Exception as e:
+            await self._aupdate_status("EXTRACT", f"✗ Extraction failed: {str(e)}")
+            result = None
         
+        stored = await sync_to_async(self._store_interactions)(result.interactions if result else [], doi, pub_date)
+        count = state.get("interactions_count", 0) + stored
         return {"interactions_count": count, "current_paper": {}, "paper_md": ""}
     
     # Routing functions
@@ -417,15 +594,134 @@ Paper content:
             return "create_query"
 
 
+def _bind(method_name: str):
+    """Wrap a ScraperService method as a graph node that looks up the job's service from config"""
+    method = getattr(ScraperService, method_name)
+    if inspect.iscoroutinefunction(method):
+        async def node(state: GraphState, config: RunnableConfig):
+            return await method(config["configurable"]["service"], state)
+    else:
+        def node(state: GraphState, config: RunnableConfig):
+            return method(config["configurable"]["service"], state)
+    node.__name__ = method_name
+    return node
+
+
+@functools.lru_cache(maxsize=1)
+def _get_compiled_agent():
+    """Build and compile the LangGraph workflow once per process.
+
+    The topology is the same for every job, so nodes are bound to the
+    running ScraperService through ``config["configurable"]["service"]``
+    instead of being captured from ``self``.
+    """
+    workflow = StateGraph(GraphState)
+    
+    # Add nodes
+    workflow.add_node("create_query", _bind("_create_query"))
+    workflow.add_node("search_pubmed", _bind("_search_pubmed"))
+    workflow.add_node("filter_papers", _bind("_filter_papers"))
+    workflow.add_node("classify_all_abstracts", _bind("_classify_all_abstracts"))
+    workflow.add_node("check_abstract", _bind("_check_abstract"))
+    workflow.add_node("download_paper", _bind("_download_paper"))
+    workflow.add_node("extract_interactions", _bind("_extract_interactions"))
+    
+    # Add edges
+    workflow.add_edge(START, "create_query")
+    workflow.add_edge("create_query", "search_pubmed")
+    workflow.add_edge("search_pubmed", "filter_papers")
+    workflow.add_edge("filter_papers", "classify_all_abstracts")
+    workflow.add_edge("classify_all_abstracts", "check_abstract")
+    
+    workflow.add_conditional_edges(
+        "check_abstract",
+        _bind("_route_after_abstract"),
+        {
+            "download_paper": "download_paper",
+            "check_abstract": "check_abstract",
+            "create_query": "create_query"
+        }
+    )
+    
+    workflow.add_conditional_edges(
+        "download_paper",
+        _bind("_route_after_download"),
+        {
+            "extract_interactions": "extract_interactions",
+            "check_abstract": "check_abstract",
+            "create_query": "create_query"
+        }
+    )
+    
+    workflow.add_conditional_edges(
+        "extract_interactions",
+        _bind("_route_after_extraction"),
+        {
+            "check_abstract": "check_abstract",
+            "create_query": "create_query",
+            END: END
+        }
+    )
+    
+    return workflow.compile()
+
+
 def run_scraper_job(job_id: int):
     """Run scraper job in background thread"""
-    service = ScraperService(job_id)
-    service.run()
+    try:
+        service = ScraperService(job_id)
+        service.run()
+    finally:
+        # Persistent connections are per thread; don't leave this one open
+        connections.close_all()
+
+
+def claim_job(job_id: int) -> bool:
+    """Atomically take a job for this worker; False if it is finished or another live worker holds it"""
+    now = timezone.now()
+    return bool(
+        ScraperJob.objects.filter(pk=job_id)
+        .exclude(status__in=['completed', 'failed'])
+        .filter(Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lt=now))
+        .update(lease_expires_at=now + timedelta(seconds=JOB_LEASE_SECONDS))
+    )
+
+
+def release_job(job_id: int):
+    """Drop this worker's claim so a later delivery isn't kept waiting for the lease to expire"""
+    ScraperJob.objects.filter(pk=job_id).update(lease_expires_at=None)
 
 
 def start_scraper_job_async(job_id: int):
-    """Start scraper job in a background thread"""
+    """Queue scraper job on Celery if a broker is configured, else start a background thread"""
+    if settings.CELERY_BROKER_URL:
+        from .tasks import run_scraper_job as run_scraper_job_task
+        run_scraper_job_task.apply_async(args=[job_id], queue=settings.SCRAPER_QUEUE)
+        return None
+    _JOB_STOP_EVENTS[job_id] = threading.Event()
     thread = threading.Thread(target=run_scraper_job, args=(job_id,), daemon=True)
     thread.start()
     return thread
 
+
+def request_job_stop(job_id: int):
+    """Signal a job to stop at its next check, wherever it runs"""
+    if not signal_local_job_stop(job_id) and settings.CELERY_BROKER_URL:
+        # Only a shortcut for workers running jobs in threads (--pool threads):
+        # prefork children never see it, so the stop_requested flag the caller
+        # already committed is what actually stops the job
+        from celery import current_app
+        try:
+            current_app.control.broadcast('stop_scraper_job', arguments={'job_id': job_id})
+        except Exception:
+            # Broker down; the job still stops at its next DB check
+            logger.exception("Broadcasting stop for job %s failed", job_id)
+
+
+def signal_local_job_stop(job_id: int) -> bool:
+    """Set the stop flag of a job running in this process; False if it isn't running here"""
+    event = _JOB_STOP_EVENTS.get(job_id)
+    if event is None:
+        return False
+    event.set()
+    return True
@@ -0,0 +1,29 @@
+"""
+Celery tasks for the scraper app
+"""
+from celery import shared_task
+from celery.worker.control import control_command
+from django.conf import settings
+
+from . import services
+
+
+@shared_task(bind=True, acks_late=True, soft_time_limit=settings.SCRAPER_JOB_SOFT_TIME_LIMIT)
+def run_scraper_job(self, job_id: int):
+    """Run a scraper job in a worker, resuming from its checkpoint if redelivered"""
+    # A redelivery while the original worker still renews its lease is skipped;
+    # one after that worker died finds the lease expired and resumes the job
+    if not services.claim_job(job_id):
+        return
+    try:
+        services.run_scraper_job(job_id)
+    finally:
+        services.release_job(job_id)
+
+
+@control_command(args=[('job_id', int)], signature='<job_id>')
+def stop_scraper_job(state, job_id: int):
+    """Remote control command broadcast by the stop view to every worker"""
+    if services.signal_local_job_stop(job_id):
+        return {'ok': f'stop signalled for job {job_id}'}
+    return {'ok': f'job {job_id} is not running here'}
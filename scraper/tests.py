@@ -0,0 +1,311 @@
+import importlib
+import threading
+import urllib.parse
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from . import services
+from .cache import interaction_total
+from .models import DOICache, Interaction, ScraperJob
+from .services import _condense_paper
+from .views import INTERACTIONS_PAGE_SIZE, _parse_cursor
+
+
+class ApiTestCase(TestCase):
+    """Base for view tests; the client's session uses the 'default' workspace"""
+
+    def setUp(self):
+        cache.clear()
+        self.job = ScraperJob.objects.create(variable_of_interest='creatine', status='completed')
+
+    def add_interactions(self, count, job=None, workspace='default', effect='+'):
+        Interaction.objects.bulk_create([
+            Interaction(
+                workspace=workspace, job=job, independent_variable=f'iv{i}', dependent_variable='dv',
+                effect=effect, reference='10.1/x', date_published='2020',
+            )
+            for i in range(count)
+        ])
+
+
+class CondensePaperTests(TestCase):
+    def test_keeps_findings_sections_and_drops_back_matter(self):
+        md = (
+            "Title and authors\n"
+            "# Introduction\nBackground.\n"
+            "# Methods\nWe did things.\n"
+            "## Participants\n20 adults.\n"
+            "# Results\nIt worked.\n"
+            "# Funding\nGrant 1.\n"
+            "# References\n[1] Someone 2020.\n"
+        )
+        condensed = _condense_paper(md)
+        self.assertIn("Title and authors", condensed)
+        self.assertIn("We did things.", condensed)
+        self.assertIn("20 adults.", condensed)
+        self.assertIn("It worked.", condensed)
+        self.assertNotIn("Background.", condensed)
+        self.assertNotIn("Grant 1.", condensed)
+        self.assertNotIn("Someone 2020", condensed)
+
+    def test_paper_without_known_sections_is_kept_apart_from_references(self):
+        md = "# Overview\nText.\n[1] A reference line\nMore text.\n# Bibliography\nB.\n"
+        condensed = _condense_paper(md)
+        self.assertEqual(condensed, "# Overview\nText.\nMore text.\n")
+
+
+
+class ClaimJobTests(TestCase):
+    def setUp(self):
+        self.job = ScraperJob.objects.create(variable_of_interest='x', status='pending')
+
+    def test_second_claim_fails_while_lease_is_live(self):
+        self.assertTrue(services.claim_job(self.job.id))
+        self.assertFalse(services.claim_job(self.job.id))
+
+    def test_expired_lease_can_be_reclaimed(self):
+        self.assertTrue(services.claim_job(self.job.id))
+        ScraperJob.objects.filter(pk=self.job.pk).update(lease_expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertTrue(services.claim_job(self.job.id))
+        self.job.refresh_from_db()
+        self.assertGreater(self.job.lease_expires_at, timezone.now())
+
+    def test_released_job_can_be_reclaimed(self):
+        self.assertTrue(services.claim_job(self.job.id))
+        services.release_job(self.job.id)
+        self.assertTrue(services.claim_job(self.job.id))
+
+    def test_finished_jobs_cannot_be_claimed(self):
+        for status in ('completed', 'failed'):
+            with self.subTest(status=status):
+                ScraperJob.objects.filter(pk=self.job.pk).update(status=status, lease_expires_at=None)
+                self.assertFalse(services.claim_job(self.job.id))
+
+class DOICacheTests(TestCase):
+    def age(self, doi, delta):
+        # updated_at is auto_now, so backdate it with a queryset update
+        DOICache.objects.filter(doi=DOICache.normalize(doi)).update(updated_at=timezone.now() - delta)
+
+    def test_negative_results_expire_after_their_ttl(self):
+        DOICache.record_failure('10.1/paywalled', 'paywalled')
+        DOICache.record_failure('10.1/unavailable', 'unavailable')
+        dois = ['10.1/paywalled', '10.1/unavailable']
+        self.assertEqual(DOICache.negative_dois(dois), set(dois))
+
+        self.age('10.1/unavailable', DOICache.NEGATIVE_TTL['unavailable'] + timedelta(minutes=1))
+        self.age('10.1/paywalled', DOICache.NEGATIVE_TTL['unavailable'] + timedelta(minutes=1))
+        self.assertEqual(DOICache.negative_dois(dois), {'10.1/paywalled'})
+
+        self.age('10.1/paywalled', DOICache.NEGATIVE_TTL['paywalled'] + timedelta(minutes=1))
+        self.assertEqual(DOICache.negative_dois(dois), set())
+
+    def test_failure_after_success_keeps_the_downloaded_path(self):
+        DOICache.record('10.1/ABC', 'downloaded', '/pdfs/abc.pdf')
+        DOICache.record_failure('https://doi.org/10.1/abc', 'paywalled')
+        DOICache.record_failure('10.1/abc', 'unavailable')
+
+        entry = DOICache.objects.get()
+        self.assertEqual((entry.status, entry.pdf_path), ('downloaded', '/pdfs/abc.pdf'))
+        self.assertEqual(DOICache.negative_dois(['10.1/abc']), set())
+        self.assertEqual(DOICache.downloaded_paths(['10.1/ABC']), {'10.1/abc': '/pdfs/abc.pdf'})
+
+    def test_new_failure_replaces_an_older_negative_result(self):
+        DOICache.record_failure('10.1/x', 'unavailable')
+        self.age('10.1/x', timedelta(days=2))
+        DOICache.record_failure('10.1/x', 'paywalled')
+
+        entry = DOICache.objects.get()
+        self.assertEqual(entry.status, 'paywalled')
+        self.assertEqual(DOICache.negative_dois(['10.1/x']), {'10.1/x'})
+
+
+
+class InteractionTotalTests(ApiTestCase):
+    def add_legacy_interactions(self, count, created_at, effect='+'):
+        # Rows saved before 0005 have no job; backdate them into a job's run
+        self.add_interactions(count, effect=effect)
+        Interaction.objects.filter(job__isnull=True, created_at__gt=created_at).update(created_at=created_at)
+
+    def test_total_matches_rows_after_reconciling_legacy_jobs(self):
+        now = timezone.now()
+        ScraperJob.objects.all().delete()
+        # Orphan whose job was deleted before interactions were linked to jobs
+        self.add_legacy_interactions(1, now - timedelta(hours=10))
+        # Legacy job: its counter already includes its job-less rows
+        legacy = ScraperJob.objects.create(
+            variable_of_interest='a', status='completed', interactions_found=3,
+            started_at=now - timedelta(hours=8), completed_at=now - timedelta(hours=7),
+        )
+        self.add_legacy_interactions(3, now - timedelta(hours=7, minutes=30))
+        # Two overlapping legacy jobs: the row's owner is ambiguous
+        for hours in (6, 5):
+            ScraperJob.objects.create(
+                variable_of_interest='b', status='completed', interactions_found=1,
+                started_at=now - timedelta(hours=hours), completed_at=now - timedelta(hours=1),
+            )
+        self.add_legacy_interactions(1, now - timedelta(hours=4))
+        # Current job with linked rows, including one with an invalid effect
+        current = ScraperJob.objects.create(variable_of_interest='c', status='completed', interactions_found=2)
+        self.add_interactions(2, job=current)
+        self.add_interactions(1, job=current, effect='none')
+        other = ScraperJob.objects.create(variable_of_interest='d', workspace='other', interactions_found=4)
+        self.add_interactions(4, job=other, workspace='other')
+
+        migration = importlib.import_module('scraper.migrations.0012_reconcile_interactions_found')
+        migration.reconcile_interactions_found(apps, None)
+
+        legacy.refresh_from_db()
+        self.assertEqual(legacy.interactions_found, 3)
+        self.assertEqual(Interaction.objects.filter(job=legacy).count(), 3)
+        for workspace in ('default', 'other'):
+            with self.subTest(workspace=workspace):
+                self.assertEqual(
+                    interaction_total(workspace),
+                    Interaction.objects.filter(workspace=workspace, effect__in=['+', '-']).count(),
+                )
+        self.assertEqual(interaction_total('default'), 7)
+
+class ParseCursorTests(TestCase):
+    def test_valid_cursor(self):
+        created_at, pk = _parse_cursor('2026-10-15T23:44:58.860180+00:00,51')
+        self.assertEqual(pk, 51)
+        self.assertEqual(created_at.microsecond, 860180)
+        self.assertEqual(created_at.utcoffset(), timedelta(0))
+
+    def test_unencoded_plus_decoded_as_space(self):
+        self.assertEqual(
+            _parse_cursor('2026-10-15T23:44:58.860180 00:00,51'),
+            _parse_cursor('2026-10-15T23:44:58.860180+00:00,51'),
+        )
+
+    def test_malformed_cursors(self):
+        for value in ['', 'nope', '51', '2026-10-15T23:44:58,', '2026-13-01T00:00:00,1', '2026-10-15T23:44:58,x']:
+            with self.subTest(value=value):
+                self.assertIsNone(_parse_cursor(value))
+
+
+class InteractionsListTests(ApiTestCase):
+    def test_pages_through_all_rows_with_tied_timestamps(self):
+        self.add_interactions(INTERACTIONS_PAGE_SIZE + 50, job=self.job)
+        self.add_interactions(5, workspace='other')
+        # Identical timestamps force the id tiebreaker
+        Interaction.objects.update(created_at=timezone.now())
+        ScraperJob.objects.filter(pk=self.job.pk).update(interactions_found=INTERACTIONS_PAGE_SIZE + 50)
+
+        first = self.client.get('/scraper/api/interactions/').json()
+        self.assertEqual(len(first['interactions']), INTERACTIONS_PAGE_SIZE)
+        self.assertTrue(first['has_more'])
+        self.assertEqual(first['total'], INTERACTIONS_PAGE_SIZE + 50)
+
+        second = self.client.get('/scraper/api/interactions/', {'after': first['next']}).json()
+        self.assertEqual(len(second['interactions']), 50)
+        self.assertFalse(second['has_more'])
+        self.assertIsNone(second['next'])
+        self.assertEqual(second['total'], INTERACTIONS_PAGE_SIZE + 50)
+
+        ids = [row['id'] for row in first['interactions'] + second['interactions']]
+        self.assertEqual(ids, sorted(ids, reverse=True))
+        self.assertEqual(set(ids), set(Interaction.objects.filter(workspace='default').values_list('id', flat=True)))
+
+    def test_unencoded_cursor_is_accepted(self):
+        self.add_interactions(INTERACTIONS_PAGE_SIZE + 1, job=self.job)
+        first = self.client.get('/scraper/api/interactions/').json()
+        response = self.client.get('/scraper/api/interactions/?after=' + first['next'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['interactions']), 1)
+
+    def test_malformed_cursor_is_rejected(self):
+        response = self.client.get('/scraper/api/interactions/?after=' + urllib.parse.quote('yesterday,1'))
+        self.assertEqual(response.status_code, 400)
+
+    def test_only_valid_effects_are_listed(self):
+        self.add_interactions(2, job=self.job)
+        self.add_interactions(3, job=self.job, effect='none')
+        data = self.client.get('/scraper/api/interactions/').json()
+        self.assertEqual(len(data['interactions']), 2)
+        self.assertEqual(data['total'], 2)
+
+
+class JobLogsTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.logs = '[00:00:00] a ✓\n[00:00:01] b 💾\n'
+        ScraperJob.objects.filter(pk=self.job.pk).update(logs=self.logs)
+        self.url = f'/scraper/api/job/{self.job.pk}/logs/'
+
+    def test_offset_returns_only_new_text(self):
+        data = self.client.get(self.url).json()
+        self.assertEqual(data, {'logs': self.logs, 'offset': len(self.logs)})
+
+        self.assertEqual(self.client.get(self.url, {'offset': len(self.logs)}).json(), {'logs': '', 'offset': len(self.logs)})
+
+        ScraperJob.objects.filter(pk=self.job.pk).update(logs=self.logs + '[00:00:02] c\n')
+        data = self.client.get(self.url, {'offset': len(self.logs)}).json()
+        self.assertEqual(data, {'logs': '[00:00:02] c\n', 'offset': len(self.logs) + 13})
+
+    def test_offset_counts_characters(self):
+        start = self.logs.index('[00:00:01]')
+        self.assertEqual(self.client.get(self.url, {'offset': start}).json()['logs'], '[00:00:01] b 💾\n')
+
+    def test_bad_offset_and_other_workspace(self):
+        self.assertEqual(self.client.get(self.url, {'offset': 'x'}).status_code, 400)
+        other = ScraperJob.objects.create(variable_of_interest='x', workspace='other')
+        self.assertEqual(self.client.get(f'/scraper/api/job/{other.pk}/logs/').status_code, 404)
+
+
+class JobStatusTests(ApiTestCase):
+    def test_etag_answers_304_until_the_job_changes(self):
+        url = f'/scraper/api/job/{self.job.pk}/status/'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('logs', response.json())
+        etag = response['ETag']
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # Logs are served separately and don't affect the status ETag
+        ScraperJob.objects.filter(pk=self.job.pk).update(logs='more')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        ScraperJob.objects.filter(pk=self.job.pk).update(current_step='Extracting')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['current_step'], 'Extracting')
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_other_workspace_is_404(self):
+        other = ScraperJob.objects.create(variable_of_interest='x', workspace='other')
+        self.assertEqual(self.client.get(f'/scraper/api/job/{other.pk}/status/').status_code, 404)
+
+
+class StopJobTests(ApiTestCase):
+    def test_running_job_is_flagged_and_signalled(self):
+        job = ScraperJob.objects.create(variable_of_interest='x', status='running')
+        event = services._JOB_STOP_EVENTS[job.pk] = threading.Event()
+        self.addCleanup(services._JOB_STOP_EVENTS.pop, job.pk, None)
+
+        response = self.client.post(f'/scraper/api/job/{job.pk}/stop/')
+        self.assertEqual(response.status_code, 200)
+        job.refresh_from_db()
+        self.assertTrue(job.stop_requested)
+        self.assertEqual(job.status, 'running')
+        self.assertEqual(job.current_step, 'Stop requested by user')
+        self.assertTrue(job.logs.endswith('Stop requested by user\n'))
+        self.assertTrue(event.is_set())
+
+    def test_finished_job_cannot_be_stopped(self):
+        response = self.client.post(f'/scraper/api/job/{self.job.pk}/stop/')
+        self.assertEqual(response.status_code, 400)
+        self.job.refresh_from_db()
+        self.assertFalse(self.job.stop_requested)
+        self.assertEqual(self.job.logs, '')
+
+    def test_other_workspace_or_missing_job_is_404(self):
+        other = ScraperJob.objects.create(variable_of_interest='x', workspace='other', status='running')
+        self.assertEqual(self.client.post(f'/scraper/api/job/{other.pk}/stop/').status_code, 404)
+        self.assertEqual(self.client.post('/scraper/api/job/99999/stop/').status_code, 404)
+        other.refresh_from_db()
+        self.assertFalse(other.stop_requested)
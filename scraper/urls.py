@@ -8,6 +8,7 @@ urlpatterns = [
     path('graph/', views.graph_view, name='graph_view'),
     path('api/start/', views.start_job, name='start_job'),
     path('api/job/<int:job_id>/status/', views.job_status, name='job_status'),
+    path('api/job/<int:job_id>/logs/', views.job_logs, name='job_logs'),
     path('api/job/<int:job_id>/interactions/', views.job_interactions, name='job_interactions'),
     path('api/job/<int:job_id>/stop/', views.stop_job, name='stop_job'),
     path('api/job/<int:job_id>/delete/', views.delete_job, name='delete_job'),
@@ -1,33 +1,127 @@
 from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse
-from django.views.decorators.http import require_http_methods, require_GET, require_POST
+from django.utils.dateparse import parse_datetime
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.db import transaction
+from django.db.models import Q, Value
+from django.db.models.functions import Concat, Length, Substr
+from django.views.decorators.http import condition, require_GET, require_POST
 from django.views.decorators.csrf import csrf_exempt
+from .cache import all_workspaces, has_interactions, interaction_total, invalidate_interaction_stats, invalidate_workspaces, workspace_summaries
+from .forms import StartJobForm, SwitchWorkspaceForm
 from .models import Interaction, ScraperJob
-from .services import start_scraper_job_async
+from .services import request_job_stop, start_scraper_job_async
+import hashlib
 import json
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+# Columns serialized by the interaction list endpoints
+JOB_INTERACTION_FIELDS = ('id', 'independent_variable', 'dependent_variable', 'effect', 'reference', 'date_published')
+INTERACTION_FIELDS = JOB_INTERACTION_FIELDS + ('created_at',)
+INTERACTIONS_PAGE_SIZE = 100
+# Rows fetched per database round-trip and per streamed chunk
+STREAM_CHUNK_SIZE = 500
+
+
+def fast_json_response(data, status=200):
+    """JsonResponse equivalent that encodes with orjson when it is installed"""
+    return HttpResponse(_json_dumps(data), content_type='application/json', status=status)
+
+
+def _json_dumps(data) -> bytes:
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_UTC_Z)
+    return json.dumps(data, cls=DjangoJSONEncoder).encode()
+
+
+def _stream_rows(rows, key, count_key):
+    """Yield a JSON object {key: [...rows], count_key: n} in chunks of encoded rows"""
+    yield b'{"' + key.encode() + b'":['
+    count = 0
+    separator = b''
+    chunk = []
+    for row in rows:
+        chunk.append(_json_dumps(row))
+        count += 1
+        if len(chunk) == STREAM_CHUNK_SIZE:
+            yield separator + b','.join(chunk)
+            separator = b','
+            chunk = []
+    if chunk:
+        yield separator + b','.join(chunk)
+    yield b'],"' + count_key.encode() + b'":' + str(count).encode() + b'}'
+
 
 def get_current_workspace(request):
     """Get current workspace from session, defaulting to 'default'"""
     return request.session.get('workspace', 'default')
 
 
+def _json_loads(raw):
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _json_body(request):
+    """Decoded JSON object from the request body, or None if the body isn't one"""
+    # Parsed once per request; later callers reuse the result
+    if not hasattr(request, '_json_body'):
+        try:
+            data = _json_loads(request.body)
+        except ValueError:  # orjson.JSONDecodeError subclasses ValueError
+            data = None
+        request._json_body = data if isinstance(data, dict) else None
+    return request._json_body
+
+
+def _form_error(form):
+    """First validation message of a bound form"""
+    return next(iter(form.errors.values()))[0]
+
+
+def _parse_cursor(value):
+    """Split an interactions ?after=<created_at>,<id> cursor, or None if malformed"""
+    # A cursor passed without URL-encoding arrives with its '+' offset decoded as a space
+    created_at, _, pk = value.replace(' ', '+').rpartition(',')
+    try:
+        created_at = parse_datetime(created_at)
+        pk = int(pk)
+    except ValueError:
+        return None
+    return (created_at, pk) if created_at else None
+
+
+def _parse_force(request):
+    """Read the force flag from a form post or a JSON body"""
+    if request.content_type != 'application/json':
+        return request.POST.get('force') == 'true'
+    return (_json_body(request) or {}).get('force') is True
+
+
 def scraper_home(request):
     """Main scraper interface"""
     workspace = get_current_workspace(request)
-    recent_jobs = ScraperJob.objects.filter(workspace=workspace)[:10]
-    total_interactions = Interaction.objects.filter(workspace=workspace).count()
+    recent_jobs = ScraperJob.objects.filter(workspace=workspace).only(
+        'id', 'variable_of_interest', 'status', 'interactions_found', 'started_at', 'completed_at'
+    )[:10]
+    # Same cached +/- count the interactions API reports as its total
+    total_interactions = interaction_total(workspace)
     
     # Get list of all workspaces
-    all_workspaces = list(ScraperJob.objects.values_list('workspace', flat=True).distinct())
-    if 'default' not in all_workspaces:
-        all_workspaces.insert(0, 'default')
+    workspaces = all_workspaces()
     
     context = {
         'recent_jobs': recent_jobs,
         'total_interactions': total_interactions,
         'current_workspace': workspace,
-        'all_workspaces': all_workspaces,
+        'all_workspaces': workspaces,
     }
     return render(request, 'scraper/home.html', context)
 
@@ -37,17 +131,12 @@ def graph_view(request):
     workspace = get_current_workspace(request)
     
     # Get list of all workspaces
-    all_workspaces = list(ScraperJob.objects.values_list('workspace', flat=True).distinct())
-    if 'default' not in all_workspaces:
-        all_workspaces.insert(0, 'default')
-    
-    # Check if workspace has interactions
-    has_interactions = Interaction.objects.filter(workspace=workspace).exists()
+    workspaces = all_workspaces()
     
     context = {
         'current_workspace': workspace,
-        'all_workspaces': all_workspaces,
-        'has_interactions': has_interactions,
+        'all_workspaces': workspaces,
+        'has_interactions': has_interactions(workspace),
     }
     return render(request, 'scraper/graph_view.html', context)
 
@@ -56,50 +145,58 @@ def graph_view(request):
 @csrf_exempt
 def start_job(request):
     """Start a new scraper job"""
-    try:
-        data = json.loads(request.body)
-        variable_of_interest = data.get('variable_of_interest', '').strip()
-        min_interactions = int(data.get('min_interactions', 5))
-        workspace = get_current_workspace(request)
-        
-        if not variable_of_interest:
-            return JsonResponse({'error': 'Variable of interest is required'}, status=400)
-        
-        # Create job
-        job = ScraperJob.objects.create(
-            workspace=workspace,
-            variable_of_interest=variable_of_interest,
-            min_interactions=min_interactions,
-            status='pending'
-        )
-        
-        # Start in background
-        start_scraper_job_async(job.id)
-        
-        return JsonResponse({
-            'job_id': job.id,
-            'status': job.status,
-            'message': 'Job started successfully'
-        })
+    data = _json_body(request)
+    if data is None:
+        return JsonResponse({'error': 'Request body must be a JSON object'}, status=400)
+    form = StartJobForm(data)
+    if not form.is_valid():
+        return JsonResponse({'error': _form_error(form)}, status=400)
+    workspace = get_current_workspace(request)
+    
+    # Create job
+    job = ScraperJob.objects.create(
+        workspace=workspace,
+        variable_of_interest=form.cleaned_data['variable_of_interest'],
+        min_interactions=form.cleaned_data['min_interactions'],
+        status='pending'
+    )
+    
+    invalidate_workspaces()
+    
+    # Start in background
+    start_scraper_job_async(job.id)
     
-    except Exception as e:
-        return JsonResponse({'error': str(e)}, status=500)
+    return JsonResponse({
+        'job_id': job.id,
+        'status': job.status,
+        'message': 'Job started successfully'
+    })
+
+
+def job_etag(request, job_id):
+    """ETag for job_status from the fields that change while a job runs"""
+    state = ScraperJob.objects.filter(id=job_id, workspace=get_current_workspace(request)).values_list(
+        'status', 'interactions_found', 'papers_checked', 'current_step', 'stop_requested', 'error_message', 'completed_at'
+    ).first()
+    if state is None:
+        return None
+    return hashlib.blake2b(repr(state).encode(), digest_size=8).hexdigest()
 
 
 @require_GET
+@condition(etag_func=job_etag)
 def job_status(request, job_id):
     """Get job status and progress"""
     workspace = get_current_workspace(request)
-    job = get_object_or_404(ScraperJob, id=job_id, workspace=workspace)
+    job = get_object_or_404(ScraperJob.objects.defer('logs', 'checkpoint'), id=job_id, workspace=workspace)
     
-    return JsonResponse({
+    return fast_json_response({
         'id': job.id,
         'variable_of_interest': job.variable_of_interest,
         'status': job.status,
         'interactions_found': job.interactions_found,
         'papers_checked': job.papers_checked,
         'current_step': job.current_step,
-        'logs': job.logs,  # accumulated logs
         'error_message': job.error_message,
         'started_at': job.started_at.isoformat(),
         'completed_at': job.completed_at.isoformat() if job.completed_at else None,
@@ -107,25 +204,52 @@ def job_status(request, job_id):
     })
 
 
+@require_GET
+def job_logs(request, job_id):
+    """Get a job's logs from ?offset= (characters already received) onwards"""
+    workspace = get_current_workspace(request)
+    try:
+        offset = max(int(request.GET.get('offset', 0)), 0)
+    except ValueError:
+        return JsonResponse({'error': 'offset must be an integer'}, status=400)
+    
+    # Slice in the database so each poll only transfers lines added since the last one
+    job = get_object_or_404(
+        ScraperJob.objects.annotate(new_logs=Substr('logs', offset + 1), log_length=Length('logs')).values('new_logs', 'log_length'),
+        id=job_id, workspace=workspace,
+    )
+    
+    return fast_json_response({'logs': job['new_logs'], 'offset': job['log_length']})
+
+
 @require_GET
 def interactions_list(request):
-    """Get list of all interactions for current workspace"""
+    """Get a page of interactions for current workspace, newest first, continuing from ?after="""
     workspace = get_current_workspace(request)
-    interactions = Interaction.objects.filter(workspace=workspace, effect__in=['+', '-'])[:100]  # Only valid effects
-    
-    data = [{
-        'id': i.id,
-        'independent_variable': i.independent_variable,
-        'dependent_variable': i.dependent_variable,
-        'effect': i.effect,
-        'reference': i.reference,
-        'date_published': i.date_published,
-        'created_at': i.created_at.isoformat(),
-    } for i in interactions]
+    interactions = Interaction.objects.filter(workspace=workspace, effect__in=['+', '-'])  # Only valid effects
     
-    return JsonResponse({
-        'interactions': data, 
-        'total': Interaction.objects.filter(workspace=workspace, effect__in=['+', '-']).count()
+    # Keyset pagination: seek past the last row of the previous page instead of using OFFSET
+    after = request.GET.get('after')
+    if after:
+        cursor = _parse_cursor(after)
+        if cursor is None:
+            return JsonResponse({'error': 'after must be "<created_at>,<id>"'}, status=400)
+        created_at, pk = cursor
+        interactions = interactions.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+    
+    # Fetch one extra row to know whether the page is complete without a COUNT
+    rows = list(interactions.order_by('-created_at', '-id').values(*INTERACTION_FIELDS)[:INTERACTIONS_PAGE_SIZE + 1])
+    has_more = len(rows) > INTERACTIONS_PAGE_SIZE
+    rows = rows[:INTERACTIONS_PAGE_SIZE]
+    # Built from the datetime itself; the stdlib encoder would round it to milliseconds
+    next_cursor = f"{rows[-1]['created_at'].isoformat()},{rows[-1]['id']}" if has_more else None
+    
+    # Both encoders serialize created_at natively
+    return fast_json_response({
+        'interactions': rows, 
+        'total': interaction_total(workspace) if has_more or after else len(rows),
+        'has_more': has_more,
+        'next': next_cursor,
     })
 
 
@@ -133,21 +257,12 @@ def interactions_list(request):
 def job_interactions(request, job_id):
     """Get interactions for a specific job"""
     workspace = get_current_workspace(request)
-    job = get_object_or_404(ScraperJob, id=job_id, workspace=workspace)
-    
-    # Get interactions linked to this job
-    interactions = Interaction.objects.filter(job=job, effect__in=['+', '-'])
+    job = get_object_or_404(ScraperJob.objects.only('id'), id=job_id, workspace=workspace)
     
-    data = [{
-        'id': i.id,
-        'independent_variable': i.independent_variable,
-        'dependent_variable': i.dependent_variable,
-        'effect': i.effect,
-        'reference': i.reference,
-        'date_published': i.date_published,
-    } for i in interactions]
+    # Stream interactions linked to this job instead of materializing them all
+    rows = Interaction.objects.filter(job=job, effect__in=['+', '-']).values(*JOB_INTERACTION_FIELDS).iterator(chunk_size=STREAM_CHUNK_SIZE)
     
-    return JsonResponse({'interactions': data, 'count': len(data)})
+    return StreamingHttpResponse(_stream_rows(rows, 'interactions', 'count'), content_type='application/json')
 
 
 @require_POST
@@ -155,15 +270,21 @@ def job_interactions(request, job_id):
 def stop_job(request, job_id):
     """Stop a running job"""
     workspace = get_current_workspace(request)
-    job = get_object_or_404(ScraperJob, id=job_id, workspace=workspace)
+    message = 'Stop requested by user'
     
-    if job.status == 'running':
-        job.stop_requested = True
-        job.add_log('Stop requested by user')
-        job.save(update_fields=['stop_requested', 'logs', 'current_step'])
-        return JsonResponse({'message': 'Stop requested. Job will halt shortly.', 'status': job.status})
-    else:
+    # Flag and log in one UPDATE that only matches a job that is still running
+    updated = ScraperJob.objects.filter(id=job_id, workspace=workspace, status='running').update(
+        stop_requested=True,
+        logs=Concat('logs', Value(ScraperJob.log_entry(message))),
+        current_step=message,
+    )
+    if updated:
+        request_job_stop(job_id)
+        return JsonResponse({'message': 'Stop requested. Job will halt shortly.', 'status': 'running'})
+    elif ScraperJob.objects.filter(id=job_id, workspace=workspace).exists():
         return JsonResponse({'error': 'Job is not running'}, status=400)
+    else:
+        raise Http404('No ScraperJob matches the given query.')
 
 
 @require_POST
@@ -171,10 +292,10 @@ def stop_job(request, job_id):
 def delete_job(request, job_id):
     """Delete a job and its associated data"""
     workspace = get_current_workspace(request)
-    job = get_object_or_404(ScraperJob, id=job_id, workspace=workspace)
+    job = get_object_or_404(ScraperJob.objects.only('id', 'status'), id=job_id, workspace=workspace)
     
     # Check if force delete is requested
-    force = request.POST.get('force') == 'true' or json.loads(request.body or '{}').get('force') == True
+    force = _parse_force(request)
     
     # Only allow deleting non-running jobs unless force is true
     if job.status == 'running' and not force:
@@ -183,7 +304,12 @@ def delete_job(request, job_id):
             'can_force': True
         }, status=400)
     
-    job.delete()
+    # Bulk-delete interactions first so the job's cascade has nothing to collect
+    with transaction.atomic():
+        Interaction.objects.filter(job=job).delete()
+        ScraperJob.objects.filter(pk=job.pk).delete()
+    invalidate_interaction_stats(workspace)
+    invalidate_workspaces()
     return JsonResponse({'message': 'Job deleted successfully'})
 
 
@@ -191,36 +317,32 @@ def delete_job(request, job_id):
 @csrf_exempt
 def switch_workspace(request):
     """Switch to a different workspace"""
-    try:
-        data = json.loads(request.body)
-        workspace = data.get('workspace', 'default').strip()
-        
-        if not workspace:
-            return JsonResponse({'error': 'Workspace name is required'}, status=400)
-        
-        # Store in session
-        request.session['workspace'] = workspace
-        
-        return JsonResponse({
-            'workspace': workspace,
-            'message': f'Switched to workspace: {workspace}'
-        })
+    data = _json_body(request)
+    if data is None:
+        return JsonResponse({'error': 'Request body must be a JSON object'}, status=400)
+    form = SwitchWorkspaceForm(data)
+    if not form.is_valid():
+        return JsonResponse({'error': _form_error(form)}, status=400)
+    workspace = form.cleaned_data['workspace']
+    
+    # Store in session
+    request.session['workspace'] = workspace
     
-    except Exception as e:
-        return JsonResponse({'error': str(e)}, status=500)
+    return JsonResponse({
+        'workspace': workspace,
+        'message': f'Switched to workspace: {workspace}'
+    })
 
 
 @require_GET
 def list_workspaces(request):
     """Get list of all workspaces"""
-    workspaces = list(ScraperJob.objects.values_list('workspace', flat=True).distinct())
-    if 'default' not in workspaces:
-        workspaces.insert(0, 'default')
-    
+    summaries = workspace_summaries()
     current_workspace = get_current_workspace(request)
     
-    return JsonResponse({
-        'workspaces': workspaces,
+    return fast_json_response({
+        'workspaces': [summary['workspace'] for summary in summaries],
+        'summaries': summaries,
         'current': current_workspace
     })
 